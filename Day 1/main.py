@@ -1,25 +1,243 @@
+from bisect import bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import chain
+import heapq
+import json
+import mmap
+import os
+import numpy as np
+
+
+NEWLINE = ord('\n')
+ZERO = ord('0')
 
 
 @dataclass
 class Elf:
     total_calories: int
+    number: int = 0
+
+
+def stream_elf_totals(lines):
+    """Yield the total of each blank-line separated group as it is read."""
+    total = 0
+    in_group = False
+    for line in lines:
+        line = line.strip()
+        if line:
+            total += int(line)
+            in_group = True
+        elif in_group:
+            yield total
+            total = 0
+            in_group = False
+    if in_group:
+        yield total
+
+
+def top_k_totals(totals, k=3):
+    """Keep the k largest totals in a min-heap, returned in ascending order."""
+    heap = []
+    for total in totals:
+        if len(heap) < k:
+            heapq.heappush(heap, total)
+        elif total > heap[0]:
+            heapq.heapreplace(heap, total)
+    return sorted(heap)
+
+
+def group_boundary(mm, offset):
+    """First offset at or after `offset` that starts a new group."""
+    if offset <= 0:
+        return 0
+    if offset >= len(mm):
+        return len(mm)
+    cut = mm.find(b'\n\n', offset - 1)
+    return len(mm) if cut == -1 else cut + 2
+
+
+def chunk_elf_totals(buf):
+    """Group totals of a uint8 buffer that starts and ends on a group."""
+    newlines = np.flatnonzero(buf == NEWLINE)
+    if len(buf) and buf[-1] != NEWLINE:
+        newlines = np.append(newlines, len(buf))
+    if not len(newlines):
+        return np.zeros(0, dtype=np.int64)
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+
+    # Lines of equal width share place values, so each width is parsed as
+    # one column read per digit rather than per byte.
+    lengths = newlines - starts
+    line_values = np.zeros(len(starts), dtype=np.int64)
+    widths = np.flatnonzero(np.bincount(lengths))
+    for width in widths[widths > 0]:
+        rows = np.flatnonzero(lengths == width)
+        row_starts = starts[rows]
+        values = np.zeros(len(rows), dtype=np.int64)
+        for place in range(width):
+            values *= 10
+            values += buf[row_starts + place]
+            values -= ZERO
+        line_values[rows] = values
+
+    filled = newlines > starts
+    group_starts = filled & np.concatenate(([True], ~filled[:-1]))
+    values = line_values[filled]
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(filled)[group_starts] - 1
+    return np.add.reduceat(values, offsets)
+
+
+def read_elf_totals_numpy(path, chunk_size=1 << 20):
+    """Memory-map the inventory and sum every group with numpy."""
+    totals = [np.zeros(0, dtype=np.int64)]
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return totals[0]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = np.frombuffer(mm, dtype=np.uint8)
+            start = 0
+            while start < len(mm):
+                stop = group_boundary(mm, start + chunk_size)
+                totals.append(chunk_elf_totals(data[start:stop]))
+                start = stop
+            del data
+    return np.concatenate(totals)
+
+
+def top_k_totals_numpy(totals, k=3):
+    if len(totals) > k:
+        totals = np.partition(totals, len(totals) - k)[-k:]
+    return sorted(int(t) for t in totals)
+
+
+def shard_bounds(path, n_shards):
+    """Split a file into byte ranges that only ever end on a blank line."""
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        cuts = {group_boundary(mm, size * i // n_shards)
+                for i in range(n_shards + 1)}
+    cuts = sorted(cuts)
+    return list(zip(cuts[:-1], cuts[1:]))
+
 
+def read_shard_lines(f, size):
+    while size > 0:
+        line = f.readline(size)
+        if not line:
+            break
+        size -= len(line)
+        yield line
 
-with open('input.txt', 'r') as f:
-    data = f.read().split('\n')
 
-new_elf = []
-elves = []
-max_cals = 0
-for entry in data:
-    if not entry:
-        elves.append(sum(new_elf))
-        max_cals = max(max_cals, sum(new_elf))
-        new_elf = []
+def shard_top_k(shard):
+    path, start, stop, k = shard
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = read_shard_lines(f, stop - start)
+        return top_k_totals(stream_elf_totals(lines), k)
+
+
+def top_k_totals_sharded(paths, k=3, workers=None):
+    """Local top-k per shard in a process pool, merged into a global top-k."""
+    workers = workers or os.cpu_count()
+    shards = [(path, start, stop, k)
+              for path in paths
+              for start, stop in shard_bounds(path, workers)]
+    with ProcessPoolExecutor(workers) as pool:
+        local_tops = pool.map(shard_top_k, shards)
+        return top_k_totals(chain.from_iterable(local_tops), k)
+
+
+def read_new_groups(f):
+    """Yield (total, end offset) for each finished group from f onwards.
+
+    A group is finished by a blank line or by a newline at the end of the
+    file, matching the original script, so anything appended later is
+    taken to start a new group.
+    """
+    total = 0
+    in_group = False
+    for line in iter(f.readline, b''):
+        if line.strip():
+            total += int(line)
+            in_group = True
+        elif in_group:
+            yield total, f.tell()
+            total = 0
+            in_group = False
+    if in_group and line.endswith(b'\n'):
+        yield total, f.tell()
+
+
+class ElfIndex:
+    """Elf totals kept sorted on disk for order-statistic queries."""
+
+    def __init__(self, ranked=None, offset=0):
+        self.ranked: list[Elf] = ranked or []
+        self.offset: int = offset
+        self.totals = [0] * len(self.ranked)
+        for elf in self.ranked:
+            self.totals[elf.number] = elf.total_calories
+
+    def __len__(self):
+        return len(self.ranked)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        ranked = [Elf(total, number) for total, number in data['ranked']]
+        return cls(ranked, data['offset'])
+
+    def save(self, path):
+        ranked = [(elf.total_calories, elf.number) for elf in self.ranked]
+        with open(path, 'w') as f:
+            json.dump({'offset': self.offset, 'ranked': ranked}, f)
+
+    def append(self, total):
+        elf = Elf(total, len(self.totals))
+        self.totals.append(total)
+        insort(self.ranked, elf, key=lambda e: e.total_calories)
+        return elf
+
+    def update(self, inventory_path):
+        """Index the groups added to the inventory since the last update."""
+        with open(inventory_path, 'rb') as f:
+            f.seek(self.offset)
+            for total, self.offset in read_new_groups(f):
+                self.append(total)
+
+    def rank(self, number):
+        """1-based rank of elf `number`, largest total first."""
+        return self.count_above(self.totals[number]) + 1
+
+    def kth_largest(self, k):
+        if not 1 <= k <= len(self):
+            raise ValueError(f'k must be between 1 and {len(self)}, got {k}')
+        return self.ranked[-k].total_calories
+
+    def count_above(self, calories):
+        return len(self.ranked) - bisect_right(self.ranked, calories,
+                                               key=lambda e: e.total_calories)
+
+
+def main(k=3, backend='stream'):
+    if backend == 'numpy':
+        top_elves = top_k_totals_numpy(read_elf_totals_numpy('input.txt'), k)
+    elif backend == 'sharded':
+        top_elves = top_k_totals_sharded(['input.txt'], k)
     else:
-        new_elf.append(int(entry))
+        with open('input.txt', 'r') as f:
+            top_elves = top_k_totals(stream_elf_totals(f), k)
+    print(top_elves)
+    print(sum(top_elves))
+
 
-top_3_elves = sorted(elves)[-3:]
-print(top_3_elves)
-print(sum(top_3_elves))
+if __name__ == '__main__':
+    main()
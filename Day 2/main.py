@@ -1,5 +1,8 @@
+from collections import Counter
 from enum import Enum
-import csv
+from itertools import permutations
+import os
+import numpy as np
 
 
 class Player(Enum):
@@ -15,6 +18,7 @@ class Result(Enum):
 
 
 ME_MAP = {'X': Result.LOSE, 'Y': Result.DRAW, 'Z': Result.WIN}
+ME_MOVE_MAP = {'X': Player.ROCK, 'Y': Player.PAPER, 'Z': Player.SCISSORS}
 YE_MAP = {'A': Player.ROCK, 'B': Player.PAPER, 'C': Player.SCISSORS}
 LOSING_THROWS = {Player.ROCK.name: Player.SCISSORS,
                  Player.PAPER.name: Player.ROCK,
@@ -25,23 +29,146 @@ WINNING_THROWS = {Player.ROCK.name: Player.PAPER,
                   Player.SCISSORS.name: Player.ROCK}
 
 
+def choose_throw(ye_choice, result):
+    if result == Result.DRAW:
+        return ye_choice
+    elif result == Result.LOSE:
+        return LOSING_THROWS[ye_choice.name]
+    return WINNING_THROWS[ye_choice.name]
+
+
 def calculate_score_for_row(row):
     game = row[0].split(' ')
     ye_choice, result = YE_MAP[game[0]], ME_MAP[game[1]]
+    my_choice = choose_throw(ye_choice, result)
+    return result.value + my_choice.value
 
-    if result == Result.DRAW:
-        my_choice = ye_choice
-    elif result == Result.LOSE:
-        my_choice = LOSING_THROWS[ye_choice.name]
-    else:
-        my_choice = WINNING_THROWS[ye_choice.name]
 
-    return result.value + my_choice.value
+def play(ye_choice, my_choice):
+    if my_choice == ye_choice:
+        return Result.DRAW
+    elif my_choice == WINNING_THROWS[ye_choice.name]:
+        return Result.WIN
+    return Result.LOSE
+
+
+def build_score_tables():
+    """Score every possible line as a move and as a desired result."""
+    move_scores, result_scores = {}, {}
+    for ye_key, ye_choice in YE_MAP.items():
+        for me_key, my_choice in ME_MOVE_MAP.items():
+            line = f'{ye_key} {me_key}'
+            move_scores[line] = play(ye_choice, my_choice).value + \
+                my_choice.value
+            result_scores[line] = calculate_score_for_row([line])
+    return move_scores, result_scores
+
+
+MOVE_SCORES, RESULT_SCORES = build_score_tables()
+
+
+def count_lines(lines):
+    """Counts of each of the 9 valid lines; anything else raises ValueError."""
+    counts = Counter()
+    for line, n in Counter(lines).items():
+        if line := line.strip():
+            if line not in MOVE_SCORES:
+                raise ValueError(f'invalid strategy guide line: {line!r}')
+            counts[line] += n
+    return counts
+
+
+def score_guide(lines):
+    """Count each distinct line once, then score both readings from counts.
+
+    Returns the totals with the second column read as a move and as the
+    desired result.
+    """
+    counts = count_lines(lines)
+    move_total = sum(MOVE_SCORES[line] * counts[line] for line in MOVE_SCORES)
+    result_total = sum(RESULT_SCORES[line] * counts[line]
+                       for line in RESULT_SCORES)
+    return move_total, result_total
+
+
+SCORE_TABLE = np.array([[MOVE_SCORES[f'{a} {b}'], RESULT_SCORES[f'{a} {b}']]
+                        for a in YE_MAP for b in ME_MAP], dtype=np.int64)
+
+
+def score_guide_numpy(path, chunk_rows=1 << 24):
+    """Score a guide of fixed 4 byte lines straight from a memory map.
+
+    Each chunk's opponent and player columns are strided views of the map,
+    turned into one of 9 line codes and counted with bincount, so no row
+    becomes a Python object. Lines must be 4 bytes, with Unix line endings;
+    anything else raises ValueError.
+    """
+    counts = np.zeros(9, dtype=np.int64)
+    if os.path.getsize(path):
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        size = len(data)
+        while size and data[size - 1] == ord('\n'):
+            size -= 1
+        if size % 4 != 3:
+            raise ValueError(f'{path} is not made of 4 byte lines')
+        for start in range(0, size, 4 * chunk_rows):
+            chunk = data[start:min(start + 4 * chunk_rows, size)]
+            if (chunk[1::4] != ord(' ')).any() or \
+                    (chunk[3::4] != ord('\n')).any():
+                raise ValueError(f'{path} has a line that is not "A X" '
+                                 'with a Unix line ending')
+            ye_codes, me_codes = chunk[0::4] - ord('A'), chunk[2::4] - ord('X')
+            # uint8 wraps bytes below 'A'/'X' past 2 as well
+            if (ye_codes > 2).any() or (me_codes > 2).any():
+                raise ValueError(f'{path} has a move outside A-C or X-Z')
+            counts += np.bincount(ye_codes * 3 + me_codes, minlength=9)
+        del data
+    move_total, result_total = counts @ SCORE_TABLE
+    return int(move_total), int(result_total)
+
+
+def count_matrix(lines):
+    """Count the (opponent, column) pairs of a guide as a 3x3 matrix."""
+    counts = count_lines(lines)
+    return {(ye_key, me_key): counts[f'{ye_key} {me_key}']
+            for ye_key in YE_MAP for me_key in ME_MAP}
+
+
+def best_move_mapping(matrix):
+    """Best of the 6 column-to-move mappings, scored from the matrix."""
+    best_total, best_mapping = -1, None
+    for moves in permutations(Player):
+        mapping = dict(zip(ME_MAP, moves))
+        total = 0
+        for (ye_key, me_key), n in matrix.items():
+            ye_choice, my_choice = YE_MAP[ye_key], mapping[me_key]
+            total += n * (play(ye_choice, my_choice).value + my_choice.value)
+        if total > best_total:
+            best_total, best_mapping = total, mapping
+    return best_total, best_mapping
+
+
+def best_result_mapping(matrix):
+    """Best of the 6 column-to-result mappings, scored from the matrix."""
+    best_total, best_mapping = -1, None
+    for results in permutations(Result):
+        mapping = dict(zip(ME_MAP, results))
+        total = 0
+        for (ye_key, me_key), n in matrix.items():
+            result = mapping[me_key]
+            my_choice = choose_throw(YE_MAP[ye_key], result)
+            total += n * (result.value + my_choice.value)
+        if total > best_total:
+            best_total, best_mapping = total, mapping
+    return best_total, best_mapping
+
 
+def main():
+    with open('input.txt', 'r') as f:
+        move_total, result_total = score_guide(f)
+    print(move_total)
+    print(result_total)
 
-with open('input.txt', 'r') as f:
-    reader = csv.reader(f)
-    data = [row for row in reader]
 
-score = [calculate_score_for_row(row) for row in data]
-print(sum(score))
+if __name__ == '__main__':
+    main()
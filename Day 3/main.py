@@ -1,44 +1,114 @@
-import csv
+from functools import reduce
+from itertools import islice
+from operator import and_
+import numpy as np
 
 
 all_items = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
 PRIORITIES = {item: i+1 for i, item in enumerate(all_items)}
+ITEM_BITS = {item: 1 << (p - 1) for item, p in PRIORITIES.items()}
+BYTE_PRIORITIES = np.zeros(256, dtype=np.uint8)
+for item_, priority_ in PRIORITIES.items():
+    BYTE_PRIORITIES[ord(item_)] = priority_
 
 
-def chunks(lst, n):
-    """Yield successive n-sized chunks from lst."""
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
+def chunks(iterable, n):
+    """Yield successive n-sized chunks from an iterable, one at a time."""
+    it = iter(iterable)
+    while chunk := list(islice(it, n)):
+        yield chunk
+
+
+def items_mask(items):
+    """52-bit mask with bit priority-1 set for each item present."""
+    return sum(ITEM_BITS[c] for c in set(items))
 
 
 def find_dupe_item_priority(string):
     n = len(string)//2
-    first, second = string[:n], string[n:]
-    assert len(string[:n]) == len(string[n:])
-    repeat_item = [c for c in first if c in second][0]
-    return PRIORITIES[repeat_item]
+    return (items_mask(string[:n]) & items_mask(string[n:])).bit_length()
+
+
+def rucksack_lines(lines):
+    for line in lines:
+        if line := line.strip():
+            yield line
+
+
+def find_badge_priority(group, n=3):
+    """Priority of the item a group shares, or 0 for a short last group."""
+    if len(group) < n:
+        return 0
+    return reduce(and_, map(items_mask, group)).bit_length()
+
+
+def find_badges(lines, n=3):
+    return sum(find_badge_priority(group, n)
+               for group in chunks(rucksack_lines(lines), n))
+
+
+def score_rucksacks(lines, group_size=3):
+    """Both parts in one pass; a shared item's priority is its bit_length."""
+    dupe_total, badge_total = 0, 0
+    for group in chunks(rucksack_lines(lines), group_size):
+        dupe_total += sum(find_dupe_item_priority(line) for line in group)
+        badge_total += find_badge_priority(group, group_size)
+    return dupe_total, badge_total
+
+
+def presence_matrices(buf):
+    """Per-line (lines x 53) item presence for each compartment.
+
+    Column p is priority p, so a row's last True column is the highest
+    priority it holds.
+    """
+    is_newline = buf == ord('\n')
+    newlines = np.flatnonzero(is_newline)
+    if len(buf) and not is_newline[-1]:
+        newlines = np.append(newlines, len(buf))
+    if not len(newlines):
+        empty = np.zeros((0, len(all_items) + 1), dtype=bool)
+        return empty, empty
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+    mids = starts + (newlines - starts) // 2
+
+    priorities = BYTE_PRIORITIES[buf]
+    items = np.flatnonzero(priorities)
+    lines = np.cumsum(is_newline)[items]
+    in_first = items < mids[lines]
+
+    first = np.zeros((len(starts), len(all_items) + 1), dtype=bool)
+    second = np.zeros_like(first)
+    first[lines[in_first], priorities[items[in_first]]] = True
+    second[lines[~in_first], priorities[items[~in_first]]] = True
+    filled = newlines > starts
+    return first[filled], second[filled]
+
 
+def highest_priorities(presence):
+    """Highest priority present in each row, or 0, like int.bit_length."""
+    highest = presence.shape[1] - 1 - presence[:, ::-1].argmax(axis=1)
+    return np.where(presence.any(axis=1), highest, 0)
 
-def find_badges(rows):
-    total_ = 0
-    for chunk in chunks(rows, 3):
-        all_chars = {c for elf in chunk for c in elf[0]}
-        for c in all_chars:
-            if c in chunk[0][0] and c in chunk[1][0] and c in chunk[2][0]:
-                total_ += PRIORITIES[c]
-    return total_
 
+def score_rucksacks_numpy(path, group_size=3):
+    buf = np.fromfile(path, dtype=np.uint8)
+    first, second = presence_matrices(buf)
+    dupe_total = highest_priorities(first & second).sum()
+    complete = len(first) - len(first) % group_size
+    groups = (first | second)[:complete].reshape(-1, group_size,
+                                                 first.shape[1])
+    badge_total = highest_priorities(groups.all(axis=1)).sum()
+    return int(dupe_total), int(badge_total)
 
-with open('input.txt', 'r') as f:
-    reader = csv.reader(f)
-    data = [row for row in reader]
 
-total = 0
-for row in data:
-    total += find_dupe_item_priority(row[0])
+def main():
+    with open('input.txt', 'r') as f:
+        total, badge_total = score_rucksacks(f)
+    print(total)
+    print(badge_total)
 
-print(total)
 
-badge_total = find_badges(data)
-print(badge_total)
+if __name__ == '__main__':
+    main()
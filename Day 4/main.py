@@ -1,29 +1,130 @@
+from bisect import bisect_left, bisect_right
 import csv
+import heapq
+import numpy as np
 
 
-def range_to_set(string):
+def range_from_string(string):
     start, end = string.split('-')
-    start, end = int(start), int(end)
-    diff = end - start
-    new = {start, end}
-    for i in range(diff):
-        new.add(start+i)
-    return new
+    return int(start), int(end)
 
 
 def ranges_from_string(row):
-    ranges = [range_to_set(s) for s in row]
+    ranges = [range_from_string(s) for s in row]
     return ranges
 
 
-with open('input.txt', 'r') as f:
-    reader = csv.reader(f)
-    data = [ranges_from_string(row) for row in reader]
+def contains(outer, inner):
+    return outer[0] <= inner[0] and inner[1] <= outer[1]
 
 
-complete_overlaps = [pair for pair in data
-                     if pair[0].issubset(pair[1])
-                     or pair[1].issubset(pair[0])]
-any_overlaps = [pair for pair in data if any(i in pair[0] for i in pair[1])]
-print(len(any_overlaps))
+def overlaps(first, second):
+    return first[0] <= second[1] and second[0] <= first[1]
 
+
+def count_overlaps(rows):
+    """Count fully contained and overlapping pairs in one pass."""
+    complete_overlaps, any_overlaps = 0, 0
+    for row in rows:
+        if not row:
+            continue
+        first, second = ranges_from_string(row)
+        if contains(first, second) or contains(second, first):
+            complete_overlaps += 1
+        if overlaps(first, second):
+            any_overlaps += 1
+    return complete_overlaps, any_overlaps
+
+
+def load_assignments_numpy(path):
+    """Parse the whole file into an (N, 4) array of section bounds.
+
+    Numbers are split out as runs of digit bytes, then parsed a place value
+    at a time for every number of the same width together.
+    """
+    buf = np.fromfile(path, dtype=np.uint8)
+    # uint8 wraps bytes below '0' past 9, so one comparison finds digits
+    digits = buf - ord('0')
+    is_digit = np.concatenate(([False], digits <= 9, [False]))
+    edges = np.diff(is_digit.astype(np.int8))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    widths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    for width in np.unique(widths):
+        fields = np.flatnonzero(widths == width)
+        field_starts = starts[fields]
+        field_values = np.zeros(len(fields), dtype=np.int64)
+        for place in range(width):
+            field_values *= 10
+            field_values += digits[field_starts + place]
+        values[fields] = field_values
+    return values.reshape(-1, 4)
+
+
+def count_overlaps_numpy(pairs):
+    first_start, first_end, second_start, second_end = pairs.T
+    complete = ((first_start <= second_start) & (second_end <= first_end)) | \
+        ((second_start <= first_start) & (first_end <= second_end))
+    partial = (first_start <= second_end) & (second_start <= first_end)
+    return int(complete.sum()), int(partial.sum())
+
+
+class AssignmentIndex:
+    """Sorted bounds of every elf's assignment for queries across pairs.
+
+    Elf 2*i and 2*i + 1 are the two elves on row i of the input.
+    """
+
+    def __init__(self, assignments):
+        self.assignments: list[tuple[int, int]] = assignments
+        self.starts = sorted(a[0] for a in assignments)
+        self.ends = sorted(a[1] for a in assignments)
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls([r for row in rows for r in ranges_from_string(row)])
+
+    def coverage(self, section):
+        """Number of assignments that include `section`."""
+        return bisect_right(self.starts, section) - \
+            bisect_left(self.ends, section)
+
+    def count_overlapping_pairs(self):
+        n = len(self.assignments)
+        disjoint = sum(bisect_left(self.ends, start) for start in self.starts)
+        return n * (n - 1) // 2 - disjoint
+
+    def overlapping_pairs(self):
+        """Yield (elf, elf) for every overlapping pair with a sweep line."""
+        order = sorted(range(len(self.assignments)),
+                       key=lambda i: self.assignments[i])
+        active = []
+        for elf in order:
+            start, end = self.assignments[elf]
+            while active and active[0][0] < start:
+                heapq.heappop(active)
+            for _, other in active:
+                yield other, elf
+            heapq.heappush(active, (end, elf))
+
+    def most_covered(self):
+        """(section, coverage) of the lowest most-covered section."""
+        events = sorted([(start, 1) for start in self.starts] +
+                        [(end + 1, -1) for end in self.ends])
+        best_section, best, covered = None, 0, 0
+        for section, change in events:
+            covered += change
+            if covered > best:
+                best_section, best = section, covered
+        return best_section, best
+
+
+def main():
+    with open('input.txt', 'r') as f:
+        complete_overlaps, any_overlaps = count_overlaps(csv.reader(f))
+    print(complete_overlaps)
+    print(any_overlaps)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,201 @@
-STACK_INDEX_MAP = {k: s for k, s in zip(range(0, 10*4, 4), '123456789')}
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from enum import Enum
+import re
+
+
+MOVE_PATTERN = re.compile(r'move (\d+) from (\S+) to (\S+)')
 
 
 def parse_move(move):
-    entries = move.split(' ')
-    start = entries[3]
-    end = entries[5].strip('\n')
-    amount = int(entries[1])
-    return start, end, amount
+    amount, start, end = MOVE_PATTERN.match(move).groups()
+    return start, end, int(amount)
+
+
+def stream_moves(lines):
+    for line in lines:
+        if line.strip():
+            yield parse_move(line)
+
+
+def read_drawing(lines):
+    """Read the crate drawing up to the blank line before the moves."""
+    drawing = []
+    for line in lines:
+        if not line.strip():
+            break
+        drawing.append(line.rstrip('\n'))
+    return drawing
 
 
 def parse_crates(crates_input):
-    numbers_row = [r for r in crates_input if r[:2] == ' 1'][0]
-    stacks = {k: []
-              for k in [s
-                        for s in numbers_row.split(' ')
-                        if s in '123456789' and s]}
-    for row in crates_input:
-        for i, char in enumerate((split_row := list(row))):
+    """Stacks keyed by label, with columns taken from the numbers row."""
+    crates_input = [r.rstrip('\n') for r in crates_input if r.strip()]
+    numbers_row = crates_input[-1]
+    labels = list(re.finditer(r'\S+', numbers_row))
+    columns = [label.start() for label in labels]
+    stacks = {label.group(): [] for label in labels}
+    for row in reversed(crates_input[:-1]):
+        for i, char in enumerate(row):
             if char == '[':
-                stack_num = STACK_INDEX_MAP[i]
-                crate = ''.join(split_row[i+1])
-                stacks[stack_num].append(crate)
-    for k, stack in stacks.items():
-        stacks[k] = stack[::-1]
+                column = max(bisect_right(columns, i + 1) - 1, 0)
+                stacks[labels[column].group()].append(row[i+1])
     return stacks
 
 
-def move_crates(stacks, moves):
-    for move in moves:
-        start_stack = stacks[move[0]]
-        moving_crates = start_stack[-move[2]:]
-        remaining_crates = start_stack[:-move[2]]
-        stacks[move[0]] = remaining_crates
-        stacks[move[1]].extend(moving_crates)
+class CrateMover(Enum):
+    ONE_AT_A_TIME = 9000
+    BLOCK = 9001
+
+
+def move_crates(stacks, moves, mover=CrateMover.BLOCK):
+    """Move crates in place, costing O(crates moved) per move."""
+    for start, end, amount in moves:
+        if not amount:
+            continue
+        start_stack = stacks[start]
+        moving_crates = start_stack[-amount:]
+        del start_stack[-amount:]
+        if mover == CrateMover.ONE_AT_A_TIME:
+            moving_crates.reverse()
+        stacks[end].extend(moving_crates)
+
+
+def top_crates(stacks):
+    return ''.join([v[-1] for v in stacks.values() if v])
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A bottom-to-top view of a shared tuple of crates."""
+    crates: tuple[str, ...]
+    start: int
+    stop: int
+    flipped: bool = False
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def top(self):
+        return self.crates[self.start if self.flipped else self.stop - 1]
+
+    def split(self, keep):
+        """Split into the bottom `keep` crates and the rest, without copying."""
+        if self.flipped:
+            cut = self.stop - keep
+            return replace(self, start=cut), replace(self, stop=cut)
+        cut = self.start + keep
+        return replace(self, stop=cut), replace(self, start=cut)
+
+    def flip(self):
+        return replace(self, flipped=not self.flipped)
+
+    def to_list(self):
+        crates = self.crates[self.start:self.stop]
+        return list(crates[::-1] if self.flipped else crates)
+
+
+class SegmentStack:
+    """A crate stack held as a list of segments, relinked on every move."""
+
+    def __init__(self, crates=()):
+        crates = tuple(crates)
+        self.segments: list[Segment] = []
+        self.size: int = 0
+        if crates:
+            self.put([Segment(crates, 0, len(crates))])
+
+    def __len__(self):
+        return self.size
+
+    def take(self, amount):
+        taken = []
+        while amount:
+            segment = self.segments.pop()
+            if len(segment) > amount:
+                segment, top = segment.split(len(segment) - amount)
+                self.segments.append(segment)
+                segment = top
+            taken.append(segment)
+            amount -= len(segment)
+            self.size -= len(segment)
+        return taken[::-1]
+
+    def put(self, segments):
+        self.segments.extend(segments)
+        self.size += sum(len(segment) for segment in segments)
+
+    @property
+    def top(self):
+        return self.segments[-1].top
+
+    def to_list(self):
+        return [c for segment in self.segments for c in segment.to_list()]
+
+
+def move_segments(stacks, moves, mover=CrateMover.BLOCK):
+    """move_crates for SegmentStacks, costing O(segments) per move."""
+    for start, end, amount in moves:
+        moving_segments = stacks[start].take(amount)
+        if mover == CrateMover.ONE_AT_A_TIME:
+            moving_segments = [segment.flip()
+                               for segment in reversed(moving_segments)]
+        stacks[end].put(moving_segments)
+
+
+class MoveHistory:
+    """Stack states every `every` moves, for queries about any past move.
+
+    Each checkpoint shares the tuples of stacks left untouched since the
+    one before, so only stacks that moved are copied. Smaller `every` costs
+    more memory and replays fewer moves per query.
+    """
+
+    def __init__(self, stacks, moves, every=1000, mover=CrateMover.BLOCK):
+        self.moves = list(moves)
+        self.every: int = every
+        self.mover: CrateMover = mover
+        snapshot = {k: tuple(stack) for k, stack in stacks.items()}
+        self.checkpoints = [snapshot]
+        live = {k: list(stack) for k, stack in stacks.items()}
+        dirty = set()
+        for i, move in enumerate(self.moves, 1):
+            move_crates(live, (move,), mover)
+            dirty.update(move[:2])
+            if i % every == 0:
+                snapshot = snapshot | {k: tuple(live[k]) for k in dirty}
+                self.checkpoints.append(snapshot)
+                dirty.clear()
+
+    def stacks_after(self, move_number):
+        """Stacks after the first `move_number` moves."""
+        if not 0 <= move_number <= len(self.moves):
+            raise ValueError(f'move_number must be between 0 and '
+                             f'{len(self.moves)}, got {move_number}')
+        checkpoint = move_number // self.every
+        stacks = {k: list(stack)
+                  for k, stack in self.checkpoints[checkpoint].items()}
+        replay = self.moves[checkpoint * self.every:move_number]
+        move_crates(stacks, replay, self.mover)
+        return stacks
+
+    def top_crates_after(self, move_number):
+        return top_crates(self.stacks_after(move_number))
 
 
-with open('input.txt', 'r') as f:
-    data = f.readlines()
+def main():
+    with open('input.txt', 'r') as f:
+        s = parse_crates(read_drawing(f))
+        stacks = {mover: {k: stack.copy() for k, stack in s.items()}
+                  for mover in CrateMover}
+        for move in stream_moves(f):
+            for mover, mover_stacks in stacks.items():
+                move_crates(mover_stacks, (move,), mover)
 
+    for mover_stacks in stacks.values():
+        print(top_crates(mover_stacks))
 
-crates = []
-moves_ = []
-for r in data:
-    if r[:3] == 'mov':
-        moves_.append(parse_move(r))
-    else:
-        crates.append(r)
 
-s = parse_crates(crates)
-move_crates(s, moves_)
-final_crates = ''.join([v[-1] for v in s.values()])
-print(final_crates)
+if __name__ == '__main__':
+    main()
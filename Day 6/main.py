@@ -1,20 +1,151 @@
-def find_first_marker(message):
-    for i in range(len(message)-4):
-        packet = {j for j in message[i:i+4]}
-        if len(packet) == 4:
-            return i + 4
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import mmap
+import multiprocessing
+import os
 
 
-def find_first_message(message):
-    for i in range(len(message)-14):
-        packet = {j for j in message[i:i+14]}
-        if len(packet) == 14:
-            return i + 14
+def find_markers(stream, windows):
+    """First marker position for each window size, from a single pass.
 
+    `left` is the start of the current run of distinct characters, moved
+    past the last sighting of any repeat, so each character is seen once.
+    """
+    remaining = sorted(set(windows))
+    markers = dict.fromkeys(remaining)
+    last_seen = {}
+    left = 0
+    for i, char in enumerate(stream):
+        left = max(left, last_seen.get(char, -1) + 1)
+        last_seen[char] = i
+        while remaining and i - left + 1 >= remaining[0]:
+            markers[remaining.pop(0)] = i + 1
+        if not remaining:
+            break
+    return markers
 
-with open('input.txt', 'r') as f:
-    m = f.read()
 
-print(find_first_marker(m))
-print(find_first_message(m))
+def find_marker(stream, window):
+    return find_markers(stream, (window,))[window]
 
+
+def init_scan_worker(best_marker):
+    global BEST_MARKER
+    BEST_MARKER = best_marker
+
+
+def scan_chunk(chunk):
+    """First marker ending in a chunk, or None once a lower one is known."""
+    path, start, stop, window, block_size = chunk
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block_start in range(start, stop - window + 1, block_size):
+            if BEST_MARKER.value < block_start + window:
+                return None
+            block_stop = min(block_start + block_size + window - 1, stop)
+            marker = find_marker(mm[block_start:block_stop], window)
+            if marker is not None:
+                with BEST_MARKER.get_lock():
+                    BEST_MARKER.value = min(BEST_MARKER.value,
+                                            block_start + marker)
+                return block_start + marker
+    return None
+
+
+def find_marker_parallel(path, window, workers=None, block_size=1 << 16):
+    """Scan a memory-mapped datastream in overlapping chunks in parallel.
+
+    Chunks overlap by window - 1 bytes so no window is lost at an edge.
+    Workers share the lowest marker found so far and give up on any block
+    that could only produce a later one.
+    """
+    workers = workers or os.cpu_count()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            f.seek(-1, os.SEEK_END)
+            size -= f.read(1) == b'\n'
+    chunk_size = max(-(-size // workers), block_size)
+    chunks = [(path, start, min(start + chunk_size + window - 1, size),
+               window, block_size)
+              for start in range(0, size, chunk_size)]
+    best_marker = multiprocessing.Value('q', size + 1)
+    with ProcessPoolExecutor(workers, initializer=init_scan_worker,
+                             initargs=(best_marker,)) as pool:
+        markers = [m for m in pool.map(scan_chunk, chunks) if m is not None]
+    return min(markers, default=None)
+
+
+class MarkerScanner:
+    """Incremental marker search over a stream delivered in chunks.
+
+    Only the last `window` characters are kept, with their counts and the
+    number of characters currently repeated in the window.
+    """
+
+    def __init__(self, window):
+        self.window: int = window
+        self.position: int = 0
+        self.marker: int | None = None
+        self._recent = deque()
+        self._counts = Counter()
+        self._repeats = 0
+
+    def feed(self, data):
+        """Consume a chunk, returning the marker position once it is found."""
+        if self.marker is not None:
+            return self.marker
+        for char in data:
+            if len(self._recent) == self.window:
+                oldest = self._recent.popleft()
+                self._counts[oldest] -= 1
+                if self._counts[oldest] == 1:
+                    self._repeats -= 1
+                elif not self._counts[oldest]:
+                    del self._counts[oldest]
+            self._recent.append(char)
+            self._counts[char] += 1
+            if self._counts[char] == 2:
+                self._repeats += 1
+            self.position += 1
+            if len(self._recent) == self.window and not self._repeats:
+                self.marker = self.position
+                return self.marker
+        return None
+
+
+async def pipe_reader(pipe):
+    """Wrap the read end of a pipe in an asyncio.StreamReader."""
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+async def watch_stream(reader, window, chunk_size=4096):
+    scanner = MarkerScanner(window)
+    while chunk := await reader.read(chunk_size):
+        if (marker := scanner.feed(chunk)) is not None:
+            return marker
+    return None
+
+
+async def watch_streams(readers, window):
+    """Marker of each named StreamReader, all watched on one event loop."""
+    markers = await asyncio.gather(*(watch_stream(reader, window)
+                                     for reader in readers.values()))
+    return dict(zip(readers, markers))
+
+
+def main():
+    with open('input.txt', 'r') as f:
+        m = f.read().strip()
+
+    markers = find_markers(m, (4, 14))
+    print(markers[4])
+    print(markers[14])
+
+
+if __name__ == '__main__':
+    main()
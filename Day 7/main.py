@@ -1,4 +1,8 @@
+from array import array
 from enum import Enum
+import json
+import time
+import numpy as np
 
 
 class CommandNotFound(Exception):
@@ -6,24 +10,36 @@ class CommandNotFound(Exception):
 
 
 class Record:
-    def __init__(self, name, is_dir, size, children=[]):
+    __slots__ = ('name', 'is_directory', '_size', 'parent', '_children')
+
+    def __init__(self, name, is_dir, size=0, parent=None):
         self.name: str = name
         self.is_directory: bool = is_dir
-        self._size: int = 0
-        self.parent: 'Record' = None
-        self._children: 'list[Record]' = None
+        self._size: int = 0 if is_dir else size
+        self.parent: 'Record' = parent
+        self._children: 'dict[str, Record]' = None
 
     @property
     def size(self):
-        if self.is_directory:
-            size = sum([r.size for r in self.children])
-            self._size = size
+        """Cached total, kept current by add_child."""
         return self._size
 
+    def add_child(self, child: 'Record'):
+        child.parent = self
+        self.children[child.name] = child
+        self.update_size(child.size)
+
+    def update_size(self, difference: int):
+        """Add `difference` to this record's size and all its ancestors'."""
+        record = self
+        while record is not None:
+            record._size += difference
+            record = record.parent
+
     @property
     def children(self):
         if self._children is None:
-            self._children = []
+            self._children = {}
         return self._children
 
 
@@ -32,15 +48,17 @@ class Commands(Enum):
     LS = 'ls'
 
 
-def parse_command(line_, dir_: Record):
+def parse_command(line_, dir_: Record, new_dirs=None):
     line_ = line_.replace('\n', '')
     items = line_.split(' ')
     if items[1] == Commands.CD.name.lower():
         command = Commands.CD.name
         if items[2] == '..':
-            new_dir = dir_.parent
+            new_dir = dir_.parent if dir_.parent is not None else dir_
+        elif items[2] == '/' and dir_ is not None:
+            new_dir = find_root(dir_)
         else:
-            new_dir = identify_or_create_dir(dir_, items[2])
+            new_dir = identify_or_create_dir(dir_, items[2], new_dirs)
     elif items[1] == Commands.LS.name.lower():
         command = Commands.LS.name
         new_dir = dir_
@@ -49,96 +67,260 @@ def parse_command(line_, dir_: Record):
     return command, new_dir
 
 
-def parse_output(line_, dir_):
+def parse_output(line_, dir_, new_dirs=None):
     items = line_.split(' ')
     if items[0] == 'dir':
-        new_rec = identify_or_create_dir(dir_, items[1])
+        new_rec = identify_or_create_dir(dir_, items[1], new_dirs)
     else:
         new_rec = identify_or_create_file(dir_, items[1], int(items[0]))
     return new_rec
 
 
-def identify_or_create_dir(dir_, name):
-    if dir_ is None:
-        new_dir = Record(name, True, parent=None)
-    elif name in [d.name for d in dir_.children]:
-        new_dir = [d for d in dir_.children if d.name == name][0]
-    else:
-        new_dir = Record(name, True, parent=dir_)
-        dir_.children.append(new_dir)
+def identify_or_create_dir(dir_, name, new_dirs=None):
+    """Find or make a directory, appending any it makes to `new_dirs`."""
+    new_dir = dir_.children.get(name) if dir_ is not None else None
+    if new_dir is None:
+        new_dir = Record(name, True)
+        if dir_ is not None:
+            dir_.add_child(new_dir)
+        if new_dirs is not None:
+            new_dirs.append(new_dir)
     return new_dir
 
 
 def identify_or_create_file(dir_: Record, name: str, size: int = 0):
     if dir_ is None:
-        new_file = Record(name, False, size, parent=None)
-    elif name in [d.name for d in dir_.children]:
-        new_file = [d for d in dir_.children if d.name == name][0]
-    else:
-        new_file = Record(name, False, size, parent=dir_)
-        dir_.children.append(new_file)
+        return Record(name, False, size, parent=None)
+    new_file = dir_.children.get(name)
+    if new_file is None:
+        new_file = Record(name, False, size)
+        dir_.add_child(new_file)
+    elif new_file.size != size:
+        new_file.update_size(size - new_file.size)
     return new_file
 
 
-def parse_terminal_line(line, current_dir: Record | None, current_cmd):
+def parse_terminal_line(line, current_dir: Record | None, current_cmd,
+                        new_dirs=None):
     if line[0] == '$':
-        current_cmd, current_dir = parse_command(line, current_dir)
+        current_cmd, current_dir = parse_command(line, current_dir, new_dirs)
     else:
-        parse_output(line, current_dir)
+        parse_output(line, current_dir, new_dirs)
     return current_dir, current_cmd
 
 
 def find_root(record: Record):
-    parent = record.parent
-    if parent is not None:
-        return find_root(parent)
-    else:
-        return record
-
-
-def collect_all_dirs(parent: Record, all_recs):
-    for child in parent.children:
-        if child.is_directory:
-            all_recs.append(child)
-            collect_all_dirs(child, all_recs)
-
-
-def calc_part1(root_: Record):
-    all_recs_ = []
-    collect_all_dirs(root_, all_recs_)
-    results = [r.size
-               for r in all_recs_
-               if r.size <= 100000 and r.is_directory]
-    return sum(results)
-
-
-def calc_part2(root_: Record):
-    all_recs_ = []
-    collect_all_dirs(root_, all_recs_)
-    used_size = root_.size
-    unused_size = 70000000 - used_size
-    needed_size = 30000000
-    target_dir_size = needed_size - unused_size
-    potential_dirs = [r for r in all_recs_ if r.size > target_dir_size]
-    delete_rec = Record('Dummy', False, unused_size)
-    for rec in potential_dirs:
-        if rec.size < delete_rec.size:
-            delete_rec = rec
-    return delete_rec.size
-
-
-with open('input.txt', 'r') as f:
-    terminal = f.readlines()
-    directory, cmd = parse_terminal_line(terminal[0].replace('\n', ''),
-                                         None,
-                                         '')
-    for entry in terminal[1:]:
-        entry = entry.replace('\n', '')
-        directory, cmd = parse_terminal_line(entry, directory, cmd)
-
-
-root = find_root(directory)
-
-print(calc_part1(root))
-print(calc_part2(root))
-
+    while record.parent is not None:
+        record = record.parent
+    return record
+
+
+def collect_all_dirs(root_: Record):
+    """Every directory under and including root_, without recursion."""
+    all_dirs = []
+    stack = [root_]
+    while stack:
+        record = stack.pop()
+        all_dirs.append(record)
+        stack.extend(c for c in record.children.values() if c.is_directory)
+    return all_dirs
+
+
+def answer_parts(dir_sizes, root_size, limit=100000, disk_size=70000000,
+                 needed_size=30000000):
+    """Both answers from every directory's size and the root's size."""
+    dir_sizes = np.asarray(dir_sizes, dtype=np.int64)
+    target_dir_size = needed_size - (disk_size - root_size)
+    part1 = dir_sizes[dir_sizes <= limit].sum()
+    part2 = dir_sizes[dir_sizes > target_dir_size].min()
+    return int(part1), int(part2)
+
+
+def calc_parts(root_: Record, **limits):
+    sizes = [d.size for d in collect_all_dirs(root_)]
+    return answer_parts(sizes, root_.size, **limits)
+
+
+class FlatFileSystem:
+    """A terminal log's tree as parallel arrays, with node 0 as the root.
+
+    Nodes are only indices into `parent`, `is_directory`, `own_size` and
+    `depth`; no Record objects are created.
+    """
+
+    def __init__(self):
+        self.parent = array('q', [-1])
+        self.is_directory = array('b', [True])
+        self.own_size = array('q', [0])
+        self.depth = array('q', [0])
+        self._lookup: dict[tuple[int, str], int] = {}
+
+    def __len__(self):
+        return len(self.parent)
+
+    def identify_or_create(self, dir_, name, is_dir, size=0):
+        node = self._lookup.get((dir_, name))
+        if node is None:
+            node = len(self.parent)
+            self._lookup[dir_, name] = node
+            self.parent.append(dir_)
+            self.is_directory.append(is_dir)
+            self.own_size.append(size)
+            self.depth.append(self.depth[dir_] + 1)
+        elif not is_dir:
+            self.own_size[node] = size
+        return node
+
+    @classmethod
+    def from_terminal(cls, lines):
+        fs = cls()
+        cwd = 0
+        for line in lines:
+            items = line.split()
+            if not items:
+                continue
+            if items[0] == '$':
+                if items[1] == Commands.CD.value:
+                    if items[2] == '/':
+                        cwd = 0
+                    elif items[2] == '..':
+                        cwd = max(fs.parent[cwd], 0)
+                    else:
+                        cwd = fs.identify_or_create(cwd, items[2], True)
+                elif items[1] != Commands.LS.value:
+                    raise CommandNotFound(line)
+            elif items[0] == 'dir':
+                fs.identify_or_create(cwd, items[1], True)
+            else:
+                fs.identify_or_create(cwd, items[1], False, int(items[0]))
+        return fs
+
+    def total_sizes(self):
+        """Subtree size of every node, rolled up one depth level at a time."""
+        parent = np.frombuffer(self.parent, dtype=np.int64)
+        depth = np.frombuffer(self.depth, dtype=np.int64)
+        totals = np.array(self.own_size, dtype=np.int64)
+        order = np.argsort(depth, kind='stable')
+        level_starts = np.searchsorted(depth[order], np.arange(depth.max() + 2))
+        for level in range(depth.max(), 0, -1):
+            nodes = order[level_starts[level]:level_starts[level + 1]]
+            np.add.at(totals, parent[nodes], totals[nodes])
+        return totals
+
+    def calc_parts(self, **limits):
+        totals = self.total_sizes()
+        dir_totals = totals[np.frombuffer(self.is_directory, dtype=np.int8)
+                            .astype(bool)]
+        return answer_parts(dir_totals, totals[0], **limits)
+
+
+class TerminalSession:
+    """Follows a growing terminal log, keeping the tree and cwd current.
+
+    Only the bytes after `offset` are read on each ingest. Directory sizes
+    stay current through Record's cached totals, so the answers never need
+    the tree to be rebuilt. save() and load() carry the offset, cwd and
+    tree between runs, so a new run only parses what was appended.
+    """
+
+    def __init__(self, path):
+        self.path: str = path
+        self.offset: int = 0
+        self.root: Record | None = None
+        self.cwd: Record | None = None
+        self.cmd: str = ''
+        self.directories: list[Record] = []
+
+    def feed(self, line):
+        if not line:
+            return
+        self.cwd, self.cmd = parse_terminal_line(line, self.cwd, self.cmd,
+                                                 self.directories)
+        if self.root is None:
+            self.root = self.cwd
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            state = json.load(f)
+        session = cls(state['log'])
+        session.offset = state['offset']
+        session.cmd = state['cmd']
+        records = []
+        for name, is_dir, size, parent in state['records']:
+            record = Record(name, is_dir)
+            record._size = size
+            if parent >= 0:
+                records[parent].children[name] = record
+                record.parent = records[parent]
+            records.append(record)
+        if records:
+            session.root = records[0]
+            session.cwd = records[state['cwd']]
+        session.directories = [r for r in records if r.is_directory]
+        return session
+
+    def save(self, path):
+        """Store the tree parents first, with each record's cached size."""
+        index = {}
+        records = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            record = stack.pop()
+            index[record] = len(records)
+            parent = -1 if record.parent is None else index[record.parent]
+            records.append((record.name, record.is_directory, record.size,
+                            parent))
+            stack.extend(record.children.values())
+        state = {'log': self.path, 'offset': self.offset, 'cmd': self.cmd,
+                 'cwd': index.get(self.cwd, -1), 'records': records}
+        with open(path, 'w') as f:
+            json.dump(state, f)
+
+    def ingest(self):
+        """Parse the complete lines appended since the last ingest."""
+        n_lines = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                self.offset += len(raw)
+                self.feed(raw.decode().rstrip('\n'))
+                n_lines += 1
+        return n_lines
+
+    def follow(self, interval=1.0):
+        """Yield fresh answers each time new lines reach the log."""
+        while True:
+            if self.ingest():
+                yield self.calc_parts()
+            else:
+                time.sleep(interval)
+
+    def calc_parts(self, **limits):
+        """Both answers so far, or (0, 0) before any directory is seen."""
+        if self.root is None:
+            return 0, 0
+        sizes = [d.size for d in self.directories]
+        return answer_parts(sizes, self.root.size, **limits)
+
+
+def main():
+    with open('input.txt', 'r') as f:
+        terminal = f.readlines()
+        directory, cmd = parse_terminal_line(terminal[0].replace('\n', ''),
+                                             None,
+                                             '')
+        for entry in terminal[1:]:
+            entry = entry.replace('\n', '')
+            directory, cmd = parse_terminal_line(entry, directory, cmd)
+
+    root = find_root(directory)
+    part1, part2 = calc_parts(root)
+    print(part1)
+    print(part2)
+
+
+if __name__ == '__main__':
+    main()